@@ -1,37 +1,76 @@
+import hashlib
+
 import streamlit as st
 import pandas as pd
 
-from model import (
-    process_data,
-    train_model,
-    detect_concern,
-    has_made_progress,
-    summarize_changes,
-    generate_insight
-)
+from model import load_data, process_data, analyze_all_patients
 
 st.set_page_config(page_title="CARE-AI Dashboard", layout="wide")
 
 st.title("🧠 CARE-AI Nurse Dashboard")
 st.caption("AI-Assisted Mental Health Monitoring for Rehabilitation Centers")
 
-# Load data
-df = pd.read_csv("data/patient_data.csv")
-df = process_data(df)
+# Load data (cached across reruns; run convert_data.py to refresh the Parquet file)
+@st.cache_data(ttl=3600)
+def load_patient_data():
+    df = process_data(load_data())
+    # Order-sensitive content fingerprint (row positions matter for the caches below);
+    # downstream caches key on it instead of hashing the frame
+    row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    data_version = hashlib.blake2b(row_hashes.tobytes()).hexdigest()
+    return df, data_version
+
+
+# Risk analysis for every patient, computed once and looked up per selection
+@st.cache_data(show_spinner=False, max_entries=2)
+def load_patient_results(data_version, _df):
+    return analyze_all_patients(_df)
+
+
+# Row positions per patient, so a selection is a dict lookup rather than a full-frame mask;
+# a resource cache hands back the same read-only dict instead of unpickling a copy
+@st.cache_resource(max_entries=2)
+def load_patient_groups(data_version, _df):
+    return _df.groupby("patient_id", sort=False).indices
+
+
+# CSV export per patient; the frame itself is not hashed, only the small key
+@st.cache_data(max_entries=128)
+def encode_csv(data_version, patient_id, _display_df):
+    return _display_df.to_csv(index=False).encode("utf-8")
+
+
+# Stride-sample long series so chart payloads stay bounded as ingest grows
+def _downsample(data, max_points=500):
+    if len(data) <= max_points:
+        return data
+    return data.iloc[::-(-len(data) // max_points)]
+
+
+df, data_version = load_patient_data()
+patient_groups = load_patient_groups(data_version, df)
 
 # Patient selector
 st.sidebar.header("👤 Select Patient")
 patient_ids = df["patient_id"].unique()
 selected_patient = st.sidebar.selectbox("Patient ID", patient_ids, key="patient_selector")
 
-patient_df = df[df["patient_id"] == selected_patient].reset_index(drop=True)
+patient_df = df.iloc[patient_groups[selected_patient]].reset_index(drop=True)
 
 # AI Analysis
-model = train_model(patient_df[["sleep_hours", "activity_level", "mood_score", "therapy_attended", "heart_rate", "stress_level"]])
-risk_score = detect_concern(model, patient_df)
-progress = has_made_progress(patient_df)
-summary = summarize_changes(patient_df)
-insight = generate_insight(risk_score, progress, summary)
+with st.spinner("Analyzing patients…"):
+    results = load_patient_results(data_version, df)
+
+# Patients with too little history are skipped by analyze_all_patients
+matches = results.loc[results["patient_id"] == selected_patient] if len(results) else results
+if matches.empty:
+    st.warning(f"Not enough records to analyze patient {selected_patient} yet.")
+    st.stop()
+
+row = matches.iloc[0]
+risk_score = row["risk_score"]
+progress = row["progress"]
+insight = row["insight"]
 
 # Main Dashboard Layout
 st.markdown("---")
@@ -91,8 +130,13 @@ with col_filter1:
 with col_filter2:
     st.metric("Total Days", len(patient_df))
 
-# Filter data based on selection
-filtered_df = patient_df.tail(days_to_show).reset_index(drop=True)
+# Filter data based on selection (a positional view; keeps each row's day index)
+filtered_df = patient_df.iloc[-days_to_show:]
+
+# Summary stats for the window in one pass, shared by every tab below
+window = filtered_df[
+    ["sleep_hours", "mood_score", "heart_rate", "stress_level", "activity_level", "therapy_attended"]
+].agg(["mean", "min", "max", "sum"])
 
 # Create tabs for different visualizations
 trend_tab1, trend_tab2, trend_tab3, trend_tab4 = st.tabs(["📊 Key Metrics", "💓 Health Indicators", "🎯 Therapy & Progress", "📅 Statistics"])
@@ -102,10 +146,10 @@ with trend_tab1:
     
     # Normalize activity level for better visualization (scale to 0-10 range)
     viz_data = filtered_df[["sleep_hours", "mood_score"]].copy()
-    viz_data["activity_level_scaled"] = (filtered_df["activity_level"] / filtered_df["activity_level"].max()) * 10
+    viz_data["activity_level_scaled"] = (filtered_df["activity_level"] / window.at["max", "activity_level"]) * 10
     viz_data.columns = ["Sleep Hours", "Mood Score", "Activity (Scaled)"]
     
-    st.line_chart(viz_data, use_container_width=True, height=400)
+    st.line_chart(_downsample(viz_data), use_container_width=True, height=400)
     st.caption("📌 Activity Level is scaled 0-10 for visualization clarity")
 
 with trend_tab2:
@@ -115,15 +159,13 @@ with trend_tab2:
     
     with health_col1:
         st.markdown("**💓 Heart Rate (BPM)**")
-        st.line_chart(filtered_df["heart_rate"], use_container_width=True, color="#e74c3c", height=300)
-        avg_hr = filtered_df["heart_rate"].mean()
-        st.caption(f"Average: {avg_hr:.1f} BPM")
+        st.line_chart(_downsample(filtered_df["heart_rate"]), use_container_width=True, color="#e74c3c", height=300)
+        st.caption(f"Average: {window.at['mean', 'heart_rate']:.1f} BPM")
     
     with health_col2:
         st.markdown("**😰 Stress Level**")
-        st.line_chart(filtered_df["stress_level"], use_container_width=True, color="#9b59b6", height=300)
-        avg_stress = filtered_df["stress_level"].mean()
-        st.caption(f"Average: {avg_stress:.1f}/10")
+        st.line_chart(_downsample(filtered_df["stress_level"]), use_container_width=True, color="#9b59b6", height=300)
+        st.caption(f"Average: {window.at['mean', 'stress_level']:.1f}/10")
 
 with trend_tab3:
     st.markdown("##### Therapy Attendance & Engagement")
@@ -132,15 +174,14 @@ with trend_tab3:
     
     with therapy_col1:
         st.markdown("**🎭 Therapy Sessions**")
-        st.bar_chart(filtered_df["therapy_attended"], use_container_width=True, color="#3498db", height=300)
-        attended = filtered_df["therapy_attended"].sum()
-        st.caption(f"Attended: {attended}/{len(filtered_df)} sessions")
+        st.bar_chart(_downsample(filtered_df["therapy_attended"]), use_container_width=True, color="#3498db", height=300)
+        attended = window.at["sum", "therapy_attended"]
+        st.caption(f"Attended: {attended:.0f}/{len(filtered_df)} sessions")
     
     with therapy_col2:
         st.markdown("**📊 Activity Levels (Steps)**")
-        st.area_chart(filtered_df["activity_level"], use_container_width=True, color="#f39c12", height=300)
-        avg_activity = filtered_df["activity_level"].mean()
-        st.caption(f"Average: {avg_activity:.0f} steps/day")
+        st.area_chart(_downsample(filtered_df["activity_level"]), use_container_width=True, color="#f39c12", height=300)
+        st.caption(f"Average: {window.at['mean', 'activity_level']:.0f} steps/day")
 
 with trend_tab4:
     st.markdown("##### Summary Statistics (Last {days_to_show} Days)".replace("{days_to_show}", str(days_to_show)))
@@ -149,30 +190,25 @@ with trend_tab4:
     summary_cols = st.columns(4)
     
     with summary_cols[0]:
-        avg_sleep = filtered_df["sleep_hours"].mean()
-        min_sleep = filtered_df["sleep_hours"].min()
-        max_sleep = filtered_df["sleep_hours"].max()
+        avg_sleep, min_sleep, max_sleep = window.loc[["mean", "min", "max"], "sleep_hours"]
         st.metric("😴 Avg Sleep", f"{avg_sleep:.1f}h")
         st.caption(f"Range: {min_sleep:.1f}h - {max_sleep:.1f}h")
     
     with summary_cols[1]:
-        avg_mood = filtered_df["mood_score"].mean()
-        min_mood = filtered_df["mood_score"].min()
-        max_mood = filtered_df["mood_score"].max()
+        avg_mood, min_mood, max_mood = window.loc[["mean", "min", "max"], "mood_score"]
         st.metric("😊 Avg Mood", f"{avg_mood:.1f}/5")
         st.caption(f"Range: {min_mood:.1f} - {max_mood:.1f}")
     
     with summary_cols[2]:
-        avg_hr = filtered_df["heart_rate"].mean()
-        min_hr = filtered_df["heart_rate"].min()
-        max_hr = filtered_df["heart_rate"].max()
+        avg_hr, min_hr, max_hr = window.loc[["mean", "min", "max"], "heart_rate"]
         st.metric("💓 Avg Heart Rate", f"{avg_hr:.0f}")
-        st.caption(f"Range: {min_hr} - {max_hr} BPM")
+        st.caption(f"Range: {min_hr:.0f} - {max_hr:.0f} BPM")
     
     with summary_cols[3]:
-        therapy_rate = (filtered_df["therapy_attended"].sum() / len(filtered_df)) * 100
+        attended = window.at["sum", "therapy_attended"]
+        therapy_rate = (attended / len(filtered_df)) * 100
         st.metric("🎭 Attendance", f"{therapy_rate:.0f}%")
-        st.caption(f"{filtered_df['therapy_attended'].sum()}/{len(filtered_df)} sessions")
+        st.caption(f"{attended:.0f}/{len(filtered_df)} sessions")
 
 st.markdown("---")
 
@@ -191,7 +227,7 @@ with st.expander("📄 View Complete Patient Records"):
     )
     
     # Download button for data export
-    csv = display_df.to_csv(index=False).encode('utf-8')
+    csv = encode_csv(data_version, selected_patient, display_df)
     st.download_button(
         label="⬇️ Download Patient Data as CSV",
         data=csv,
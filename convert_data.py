@@ -0,0 +1,15 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from model import load_data
+
+CSV_PATH = "data/patient_data.csv"
+PARQUET_PATH = "data/patient_data.parquet"
+
+# Store rows in date order so process_data can skip its sort on load; a stable
+# sort keeps same-date rows (e.g. appended readings) in their recorded order
+df = load_data(CSV_PATH).sort_values("date", kind="stable")
+table = pa.Table.from_pandas(df, preserve_index=False)
+pq.write_table(table, PARQUET_PATH, compression="zstd")
+
+print(f"Converted {len(df)} rows → {PARQUET_PATH}")
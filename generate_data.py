@@ -1,47 +1,50 @@
+import numpy as np
 import pandas as pd
-import random
-from datetime import datetime, timedelta
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 NUM_PATIENTS = 100
 DAYS_PER_PATIENT = 100
 
-rows = []
-start_date = datetime(2025, 1, 1)
-
-for pid in range(1, NUM_PATIENTS + 1):
-    mood = random.uniform(2.5, 4.0)
-    base_hr = random.randint(65, 85)
-
-    for day in range(DAYS_PER_PATIENT):
-        date = start_date + timedelta(days=day)
-
-        sleep_hours = max(0, min(10, random.gauss(6.5, 1.2)))
-        activity_level = random.randint(1, 10)
-
-        # Mood evolution
-        mood += random.uniform(-0.25, 0.25)
-        mood = min(max(mood, 0), 5)
-
-        therapy_attended = random.choice([0, 1])
-
-        # Stress inversely related to mood
-        stress_level = int(min(10, max(1, 10 - mood + random.uniform(-1, 1))))
-
-        # Heart rate affected by stress
-        heart_rate = int(base_hr + stress_level * 2 + random.uniform(-5, 5))
-
-        rows.append({
-            "patient_id": pid,
-            "date": date.strftime("%Y-%m-%d"),
-            "sleep_hours": round(sleep_hours, 2),
-            "activity_level": activity_level,
-            "mood_score": round(mood, 2),
-            "therapy_attended": therapy_attended,
-            "heart_rate": heart_rate,
-            "stress_level": stress_level
-        })
-
-df = pd.DataFrame(rows)
-df.to_csv("patient_data.csv", index=False)
-
-print(f"Generated {len(df)} rows → patient_data.csv")
+rng = np.random.default_rng(0)
+shape = (NUM_PATIENTS, DAYS_PER_PATIENT)
+dates = pd.date_range("2025-01-01", periods=DAYS_PER_PATIENT, freq="D")
+
+base_mood = rng.uniform(2.5, 4.0, NUM_PATIENTS)
+base_hr = rng.integers(65, 86, NUM_PATIENTS)
+
+sleep_hours = np.clip(rng.normal(6.5, 1.2, shape), 0, 10)
+activity_level = rng.integers(1, 11, shape)
+therapy_attended = rng.integers(0, 2, shape)
+
+# Mood evolution: a random walk clamped to [0, 5] at every step,
+# advanced one day at a time for all patients at once
+mood_steps = rng.uniform(-0.25, 0.25, shape)
+mood = np.empty(shape)
+current = base_mood
+for day in range(DAYS_PER_PATIENT):
+    current = np.clip(current + mood_steps[:, day], 0, 5)
+    mood[:, day] = current
+
+# Stress inversely related to mood
+stress_level = np.clip(10 - mood + rng.uniform(-1, 1, shape), 1, 10).astype(int)
+
+# Heart rate affected by stress
+heart_rate = (base_hr[:, None] + stress_level * 2 + rng.uniform(-5, 5, shape)).astype(int)
+
+# Rows are laid out date-major (all patients for day 0, then day 1, ...)
+# so the file is already in the order process_data expects
+df = pd.DataFrame({
+    "patient_id": np.tile(np.arange(1, NUM_PATIENTS + 1), DAYS_PER_PATIENT),
+    "date": np.repeat(dates.strftime("%Y-%m-%d"), NUM_PATIENTS),
+    "sleep_hours": sleep_hours.round(2).T.ravel(),
+    "activity_level": activity_level.T.ravel(),
+    "mood_score": mood.round(2).T.ravel(),
+    "therapy_attended": therapy_attended.T.ravel(),
+    "heart_rate": heart_rate.T.ravel(),
+    "stress_level": stress_level.T.ravel(),
+})
+table = pa.Table.from_pandas(df, preserve_index=False)
+pq.write_table(table, "patient_data.parquet", compression="zstd", row_group_size=10_000)
+
+print(f"Generated {len(df)} rows → patient_data.parquet")
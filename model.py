@@ -1,14 +1,35 @@
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.ensemble import IsolationForest
 
 
+FEATURES = (
+    "sleep_hours",
+    "activity_level",
+    "mood_score",
+    "therapy_attended",
+    "heart_rate",
+    "stress_level",
+)
+
+
+def _features(df):
+    # pandas hands back a column-major block; trees traverse rows, so make it C-ordered
+    return np.ascontiguousarray(df.loc[:, list(FEATURES)].to_numpy(np.float32, copy=False))
+
+
 # ----------------------------------
 # Data Loading & Processing
 # ----------------------------------
 
-def load_data(path="data/patient_data.csv"):
-    df = pd.read_csv(path)
+def load_data(path="data/patient_data.parquet"):
+    if Path(path).suffix.lower() == ".csv":
+        df = pd.read_csv(path)
+    else:
+        df = pd.read_parquet(path, engine="pyarrow")
 
     # Normalize column names
     df.columns = df.columns.str.strip().str.lower()
@@ -21,82 +42,103 @@ def load_data(path="data/patient_data.csv"):
 
 
 def process_data(df):
-    df = df.sort_values("date")
-    df = df.fillna(df.mean(numeric_only=True))
-    return df
+    # Data files are written in date order, so the O(N) check usually skips the sort
+    if not df["date"].is_monotonic_increasing:
+        df = df.sort_values("date", kind="stable")
+    int_cols = ["activity_level", "therapy_attended", "heart_rate", "stress_level"]
+
+    # Clean data is the common case: skip the fill pass entirely
+    if df.isna().to_numpy().any():
+        df = df.fillna(df.mean(numeric_only=True))
+        df[int_cols] = df[int_cols].round()
+
+    # An all-null column has no mean to fill with; leave it as float instead of int16
+    int_cols = [col for col in int_cols if not df[col].isna().any()]
+
+    # Narrow dtypes in a single astype: halves the bytes the model and reductions touch
+    float_cols = df.select_dtypes("float64").columns.difference(int_cols)
+    dtypes = dict.fromkeys(float_cols, np.float32) | dict.fromkeys(int_cols, np.int16)
+    return df.astype(dtypes)
+
+
+# ----------------------------------
+# Patient Baselines
+# ----------------------------------
+
+def patient_stats(df):
+    # Per-patient baselines used by the rules, computed in one groupby pass
+    grouped = df.groupby("patient_id", sort=False)
+    stats = grouped.agg(
+        sleep_mean=("sleep_hours", "mean"),
+        mood_mean=("mood_score", "mean"),
+        hr_mean=("heart_rate", "mean"),
+    )
+    stats["activity_q25"] = grouped["activity_level"].quantile(0.25)
+    return stats
 
 
 # ----------------------------------
 # AI Model Training
 # ----------------------------------
 
-def train_model(df):
-    features = df[
-        [
-            "sleep_hours",
-            "activity_level",
-            "mood_score",
-            "therapy_attended",
-            "heart_rate",
-            "stress_level",
-        ]
-    ]
+def train_model(df, n_jobs=None):
+    # Returned alongside the model so scoring can reuse the same matrix
+    features = _features(df)
 
+    # ~100 rows per patient: score variance saturates well before 200 trees
     model = IsolationForest(
-        n_estimators=200,
+        n_estimators=64,
+        max_samples=min(256, len(features)),
+        bootstrap=False,
+        n_jobs=n_jobs,
         contamination=0.12,
         random_state=42,
     )
     model.fit(features)
-    return model
+    return model, features
 
 
 # ----------------------------------
 # Risk Detection (Hybrid AI + Rules)
 # ----------------------------------
 
-def detect_concern(model, df):
-    features = df[
-        [
-            "sleep_hours",
-            "activity_level",
-            "mood_score",
-            "therapy_attended",
-            "heart_rate",
-            "stress_level",
-        ]
-    ]
+def detect_concern(model, df, features=None, stats=None):
+    if features is None:
+        features = _features(df)
+    if stats is None:
+        stats = patient_stats(df).iloc[0]
 
     # AI anomaly score
     scores = model.decision_function(features)
-    risk_score = np.mean(scores)
+    return detect_concern_core(np.mean(scores), stats, features[-3:].mean(axis=0))
 
-    # Patient baselines
-    baseline_sleep = df["sleep_hours"].mean()
-    baseline_mood = df["mood_score"].mean()
-    baseline_hr = df["heart_rate"].mean()
 
-    recent_sleep = df["sleep_hours"].iloc[-3:].mean()
-    recent_mood = df["mood_score"].iloc[-3:].mean()
-    recent_hr = df["heart_rate"].iloc[-3:].mean()
-    recent_stress = df["stress_level"].iloc[-3:].mean()
-    recent_activity = df["activity_level"].iloc[-3:].mean()
+def detect_concern_core(risk_score, stats, recent_means):
+    # recent_means: last-3-day means of FEATURES; baselines come from stats
+    (
+        recent_sleep,
+        recent_activity,
+        recent_mood,
+        _,
+        recent_hr,
+        recent_stress,
+    ) = recent_means
 
     # 🔑 Escalation signals (MOOD IS CONTEXT ONLY)
-    if recent_sleep < 0.7 * baseline_sleep:
+    if recent_sleep < 0.7 * stats["sleep_mean"]:
         risk_score -= 0.30
 
-    if recent_hr > 1.15 * baseline_hr:
+    if recent_hr > 1.15 * stats["hr_mean"]:
         risk_score -= 0.25
 
     if recent_stress > 7:
         risk_score -= 0.30
 
-    if recent_activity < df["activity_level"].quantile(0.25):
+    if recent_activity < stats["activity_q25"]:
         risk_score -= 0.15
 
     # Mood contributes weakly (never escalates alone)
-    if recent_mood < 0.7 * baseline_mood:
+    if recent_mood < 0.7 * stats["mood_mean"]:
         risk_score -= 0.10
 
     return risk_score
@@ -107,30 +149,33 @@ def detect_concern(model, df):
 # ----------------------------------
 
 def has_made_progress(df):
-    if len(df) < 8:
+    mood = df["mood_score"].to_numpy()
+    if len(mood) < 8:
         return False
 
-    recent = df.tail(4)["mood_score"].mean()
-    previous = df.iloc[-8:-4]["mood_score"].mean()
-
-    return recent > previous
+    return mood[-4:].mean() > mood[-8:-4].mean()
 
 
 # ----------------------------------
 # Explainable Insight Generation
 # ----------------------------------
 
-def summarize_changes(df):
-    recent = df.tail(3)
+def summarize_changes(df, stats=None, recent=None):
+    if stats is None:
+        stats = patient_stats(df).iloc[0]
+    if recent is None:
+        recent = _features(df.iloc[-3:])
+
+    # All recent-window reductions in one pass over the last 3 rows
+    sleep, activity, mood, _, hr, stress = recent.mean(axis=0)
 
     return {
-        "sleep_drop": recent["sleep_hours"].mean() < 4,
-        "low_activity": recent["activity_level"].mean()
-        < df["activity_level"].quantile(0.25),
-        "low_mood": recent["mood_score"].mean() < 2,
-        "high_hr": recent["heart_rate"].mean() > 100,
-        "high_stress": recent["stress_level"].mean() > 7,
-        "missed_therapy": recent["therapy_attended"].sum() < 2,
+        "sleep_drop": sleep < 4,
+        "low_activity": activity < stats["activity_q25"],
+        "low_mood": mood < 2,
+        "high_hr": hr > 100,
+        "high_stress": stress > 7,
+        "missed_therapy": recent[:, FEATURES.index("therapy_attended")].sum() < 2,
     }
 
 
@@ -186,31 +231,35 @@ def generate_insight(risk_score, progress, summary):
 # ALL PATIENTS ANALYSIS
 # ----------------------------------
 
+def _analyze_one(patient_id, patient_df, stats):
+    if len(patient_df) < 5:
+        return None
+
+    # Project the feature block once and share it across model and rules
+    model, features = train_model(patient_df)
+    risk = detect_concern(model, patient_df, features, stats)
+    progress = has_made_progress(patient_df)
+    summary = summarize_changes(patient_df, stats, features[-3:])
+    insight = generate_insight(risk, progress, summary)
+
+    return {
+        "patient_id": patient_id,
+        "risk_score": round(risk, 3),
+        "progress": progress,
+        "insight": insight,
+    }
+
+
 def analyze_all_patients(df):
-    results = []
-
-    for patient_id in df["patient_id"].unique():
-        patient_df = df[df["patient_id"] == patient_id]
-
-        if len(patient_df) < 5:
-            continue
-
-        model = train_model(patient_df)
-        risk = detect_concern(model, patient_df)
-        progress = has_made_progress(patient_df)
-        summary = summarize_changes(patient_df)
-        insight = generate_insight(risk, progress, summary)
-
-        results.append(
-            {
-                "patient_id": patient_id,
-                "risk_score": round(risk, 3),
-                "progress": progress,
-                "insight": insight,
-            }
-        )
+    stats = patient_stats(df).to_dict("index")
+
+    # Patients are independent, so fan the per-patient fits out across cores
+    results = Parallel(n_jobs=-1, prefer="processes")(
+        delayed(_analyze_one)(patient_id, patient_df, stats[patient_id])
+        for patient_id, patient_df in df.groupby("patient_id", sort=False)
+    )
 
-    return pd.DataFrame(results)
+    return pd.DataFrame([r for r in results if r is not None])
 
 
 # ----------------------------------